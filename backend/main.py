@@ -1,15 +1,22 @@
 from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Literal, get_args
+from datetime import datetime, timedelta, timezone
 import os
 import json
+import itertools
+import time
+import uuid
 import logging
+import threading
+import orjson
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 from dotenv import load_dotenv
 from scrapybara import Scrapybara
@@ -93,6 +100,67 @@ if SCRAPYBARA_API_KEY:
 # Task registry to store task configurations
 TASK_REGISTRY = {}
 
+# Serialized task responses, keyed by task ID and rebuilt after the task changes
+TASK_RESPONSE_CACHE: Dict[str, Dict[str, Any]] = {}
+
+# Version of each task's cached responses, bumped on every change
+TASK_CACHE_VERSIONS: Dict[str, int] = {}
+task_cache_counter = itertools.count(1)
+
+BudgetPeriod = Literal["daily", "monthly"]
+OverBudgetAction = Literal["defer", "skip"]
+
+def _env_limit(name: str, maximum: Optional[float] = None) -> Optional[float]:
+    """Read an optional non-negative budget number from the environment"""
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or number < 0 or (maximum is not None and number > maximum):
+        logger.warning(f"Ignoring invalid value for {name}: {value}")
+        return None
+    return number
+
+def _env_choice(name: str, choices: Tuple[str, ...], default: str) -> str:
+    """Read one of a fixed set of budget options from the environment"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    if value not in choices:
+        logger.warning(f"Ignoring invalid value for {name}: {value} (expected one of {', '.join(choices)})")
+        return default
+    return value
+
+_low_priority_threshold = _env_limit("SKYBIT_BUDGET_LOW_PRIORITY_THRESHOLD", maximum=1)
+
+# Budget configuration (overridden by budget_config.json when present)
+BUDGET_CONFIG = {
+    'period': _env_choice("SKYBIT_BUDGET_PERIOD", get_args(BudgetPeriod), "daily"),
+    'max_instance_seconds': _env_limit("SKYBIT_BUDGET_MAX_INSTANCE_SECONDS"),
+    'max_steps': _env_limit("SKYBIT_BUDGET_MAX_STEPS"),
+    'max_tool_calls': _env_limit("SKYBIT_BUDGET_MAX_TOOL_CALLS"),
+    'over_budget_action': _env_choice("SKYBIT_BUDGET_ACTION", get_args(OverBudgetAction), "defer"),
+    'low_priority_threshold': 0.8 if _low_priority_threshold is None else _low_priority_threshold,
+}
+
+# Usage metrics and the budget limit that applies to each of them
+BUDGET_LIMITS = {
+    'instance_seconds': 'max_instance_seconds',
+    'steps': 'max_steps',
+    'tool_calls': 'max_tool_calls',
+}
+
+# Per-run usage records for the current month
+USAGE_LEDGER: List[Dict[str, Any]] = []
+
+# Estimated usage of runs that passed the budget check and are still running
+ACTIVE_RUNS: Dict[str, Dict[str, float]] = {}
+
+usage_lock = threading.Lock()
+
 # Pydantic models
 class ToolConfig(BaseModel):
     name: str
@@ -111,6 +179,7 @@ class TaskBase(BaseModel):
     tools: List[ToolConfig] = []
     enabled: bool = True
     schema: Optional[Dict[str, Any]] = None
+    priority: Literal["high", "normal", "low"] = "normal"
 
 class TaskCreate(TaskBase):
     pass
@@ -128,6 +197,7 @@ class TaskUpdate(BaseModel):
     tools: Optional[List[ToolConfig]] = None
     enabled: Optional[bool] = None
     schema: Optional[Dict[str, Any]] = None
+    priority: Optional[Literal["high", "normal", "low"]] = None
 
 class TaskResponse(TaskBase):
     id: str
@@ -136,6 +206,7 @@ class TaskResponse(TaskBase):
     last_run: Optional[str] = None
     last_result: Optional[Dict[str, Any]] = None
     last_error: Optional[Dict[str, Any]] = None
+    last_budget_decision: Optional[Dict[str, Any]] = None
     next_run: Optional[str] = None
 
 class TaskListResponse(BaseModel):
@@ -152,6 +223,21 @@ class StepInfo(BaseModel):
     timestamp: str
     tool_calls: Optional[List[Dict[str, Any]]] = None
 
+class BudgetConfig(BaseModel):
+    period: BudgetPeriod = "daily"
+    max_instance_seconds: Optional[float] = Field(None, ge=0)  # None means no limit
+    max_steps: Optional[float] = Field(None, ge=0)
+    max_tool_calls: Optional[float] = Field(None, ge=0)
+    over_budget_action: OverBudgetAction = "defer"
+    low_priority_threshold: float = Field(0.8, ge=0, le=1)
+
+class PreSerializedJSONResponse(ORJSONResponse):
+    """ORJSON response that passes already serialized JSON bytes through"""
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
 # Helper functions
 def load_task_registry():
     """Load task registry from disk"""
@@ -180,19 +266,279 @@ def get_next_run_time(task_id: str) -> Optional[str]:
         return job.next_run_time.isoformat()
     return None
 
-def execute_task(task_id: str, task_config: Dict[str, Any]):
-    """Execute a scheduled task using Scrapybara"""
+def invalidate_task_cache(task_id: str):
+    """Drop the cached responses of a task after it changed"""
+    TASK_CACHE_VERSIONS[task_id] = next(task_cache_counter)
+    TASK_RESPONSE_CACHE.pop(task_id, None)
+
+def get_task_cache_entry(task_id: str) -> Dict[str, Any]:
+    """Get the cache entry of a task, starting a new one if it is stale.
+
+    An entry is stale once the task changed or its next run time has passed.
+    """
+    version = TASK_CACHE_VERSIONS.get(task_id, 0)
+    entry = TASK_RESPONSE_CACHE.get(task_id)
+    if entry and entry['version'] == version:
+        if entry['expires_at'] is None or datetime.now(timezone.utc) < entry['expires_at']:
+            return entry
+    
+    next_run = get_next_run_time(task_id)
+    entry = {
+        'version': version,
+        'next_run': next_run,
+        'expires_at': datetime.fromisoformat(next_run) if next_run else None,
+        'item': None,
+        'detail': None
+    }
+    TASK_RESPONSE_CACHE[task_id] = entry
+    return entry
+
+def get_task_item_json(task_id: str) -> bytes:
+    """Get the serialized task as returned by the task list"""
+    entry = get_task_cache_entry(task_id)
+    if entry['item'] is None:
+        task = TASK_REGISTRY[task_id].copy()
+        task['id'] = task_id
+        task['next_run'] = entry['next_run']
+        entry['item'] = orjson.dumps(task)
+    return entry['item']
+
+def get_task_detail_json(task_id: str) -> bytes:
+    """Get the serialized task as returned by the task detail endpoint"""
+    entry = get_task_cache_entry(task_id)
+    if entry['detail'] is None:
+        task = TASK_REGISTRY[task_id].copy()
+        task['id'] = task_id
+        task['next_run'] = entry['next_run']
+        entry['detail'] = orjson.dumps(TaskResponse(**task).dict())
+    return entry['detail']
+
+def load_usage_ledger():
+    """Load usage ledger and budget configuration from disk"""
+    try:
+        if os.path.exists('usage_ledger.json'):
+            with open('usage_ledger.json', 'r') as f:
+                USAGE_LEDGER[:] = json.load(f)
+                logger.info(f"Loaded {len(USAGE_LEDGER)} runs from usage ledger")
+        if os.path.exists('budget_config.json'):
+            with open('budget_config.json', 'r') as f:
+                BUDGET_CONFIG.update(BudgetConfig(**json.load(f)).dict())
+                logger.info("Loaded budget configuration")
+    except Exception as e:
+        logger.error(f"Error loading usage ledger: {str(e)}")
+
+def save_usage_ledger():
+    """Save usage ledger to disk"""
+    try:
+        with open('usage_ledger.json', 'w') as f:
+            json.dump(USAGE_LEDGER, f, indent=2)
+    except Exception as e:
+        logger.error(f"Error saving usage ledger: {str(e)}")
+
+def save_budget_config():
+    """Save budget configuration to disk"""
+    try:
+        with open('budget_config.json', 'w') as f:
+            json.dump(BUDGET_CONFIG, f, indent=2)
+        logger.info("Saved budget configuration")
+    except Exception as e:
+        logger.error(f"Error saving budget configuration: {str(e)}")
+
+def get_budget_period() -> Tuple[datetime, datetime]:
+    """Get the start and end of the current budget period (UTC)"""
+    now = datetime.utcnow()
+    if BUDGET_CONFIG.get('period') == 'monthly':
+        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+    return start, end
+
+def summarize_usage(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum the usage of a list of run records"""
+    totals = {'runs': 0, 'instance_seconds': 0.0, 'act_seconds': 0.0, 'steps': 0, 'tool_calls': 0}
+    for run in runs:
+        totals['runs'] += 1
+        totals['instance_seconds'] += run.get('instance_seconds', 0.0)
+        totals['act_seconds'] += run.get('act_seconds', 0.0)
+        totals['steps'] += run.get('steps', 0)
+        totals['tool_calls'] += run.get('tool_calls', 0)
+    totals['instance_seconds'] = round(totals['instance_seconds'], 3)
+    totals['act_seconds'] = round(totals['act_seconds'], 3)
+    return totals
+
+def get_period_runs() -> List[Dict[str, Any]]:
+    """Get the run records of the current budget period"""
+    period_start = get_budget_period()[0].isoformat()
+    return [run for run in USAGE_LEDGER if run['started_at'] >= period_start]
+
+def estimate_run_usage(task_id: str) -> Dict[str, float]:
+    """Estimate the usage of a run from the average of the task's previous runs"""
+    runs = [run for run in USAGE_LEDGER if run['task_id'] == task_id]
+    if not runs:
+        return {metric: 0.0 for metric in BUDGET_LIMITS}
+    totals = summarize_usage(runs)
+    return {metric: totals[metric] / len(runs) for metric in BUDGET_LIMITS}
+
+def reserve_run_budget(task_id: str, task_config: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Check whether a run fits in the budget and reserve its estimated usage.
+
+    Returns a (reason, run_id) tuple: reason is set when the run would exceed
+    the budget, otherwise run_id identifies the reservation.
+    High priority tasks only stop once a limit is used up, low priority tasks
+    stop once usage reaches low_priority_threshold of a limit.
+    """
+    with usage_lock:
+        used = summarize_usage(get_period_runs())
+        for reservation in ACTIVE_RUNS.values():
+            for metric in BUDGET_LIMITS:
+                used[metric] += reservation[metric]
+        
+        estimate = estimate_run_usage(task_id)
+        priority = task_config.get('priority', 'normal')
+        
+        for metric, limit_key in BUDGET_LIMITS.items():
+            limit = BUDGET_CONFIG.get(limit_key)
+            if limit is None:
+                continue
+            if priority == 'high':
+                projected = used[metric]
+            else:
+                projected = used[metric] + estimate[metric]
+                if priority == 'low':
+                    limit = limit * BUDGET_CONFIG.get('low_priority_threshold', 0.8)
+            if used[metric] >= limit or projected > limit:
+                return (
+                    f"{metric} budget exceeded for {priority} priority task "
+                    f"({used[metric]:g} used, {estimate[metric]:g} estimated, limit {limit:g})",
+                    None
+                )
+        
+        run_id = uuid.uuid4().hex
+        ACTIVE_RUNS[run_id] = estimate
+        return None, run_id
+
+def release_run_budget(run_id: str):
+    """Release the reservation of a run that did not start"""
+    with usage_lock:
+        ACTIVE_RUNS.pop(run_id, None)
+
+def record_run_usage(usage: Dict[str, Any]):
+    """Add a finished run to the usage ledger and release its reservation"""
+    usage['ended_at'] = datetime.utcnow().isoformat()
+    usage['instance_seconds'] = round(usage['instance_seconds'], 3)
+    usage['act_seconds'] = round(usage['act_seconds'], 3)
+    
+    with usage_lock:
+        ACTIVE_RUNS.pop(usage['run_id'], None)
+        USAGE_LEDGER.append(usage)
+        
+        # Only keep the current month, which covers both budget periods
+        month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+        USAGE_LEDGER[:] = [run for run in USAGE_LEDGER if run['started_at'] >= month_start]
+        
+        save_usage_ledger()
+    
+    logger.info(
+        f"Task {usage['task_id']} used {usage['instance_seconds']}s instance time, "
+        f"{usage['act_seconds']}s act time, {usage['steps']} steps, {usage['tool_calls']} tool calls"
+    )
+
+def handle_over_budget(task_id: str, reason: str):
+    """Skip or defer a run that would exceed the budget"""
+    action = BUDGET_CONFIG.get('over_budget_action', 'defer')
+    message = f"Run skipped: {reason}"
+    run_date = None
+    
+    if action == 'defer':
+        # Retry once the budget period resets
+        run_date = get_budget_period()[1]
+        scheduler.add_job(
+            execute_task,
+            trigger=DateTrigger(run_date=run_date),
+            id=f"{task_id}_deferred",
+            args=[task_id],
+            replace_existing=True
+        )
+        message = f"Run deferred to {run_date.isoformat()}: {reason}"
+    
+    status = "deferred" if action == 'defer' else "skipped"
+    logger.warning(f"Task {task_id}: {message}")
+    
+    # Budget decisions are planned outcomes, so they are kept apart from last_error
+    TASK_REGISTRY[task_id]['last_budget_decision'] = {
+        'status': status,
+        'message': message,
+        'run_at': run_date.isoformat() if run_date else None,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    invalidate_task_cache(task_id)
+    save_task_registry()
+    return {"status": status, "message": message}
+
+def execute_task(task_id: str, run_id: Optional[str] = None):
+    """Execute a scheduled task using Scrapybara.
+
+    The task configuration is read from the registry when the run starts, so
+    scheduled jobs only store the task ID. run_id is the budget reservation
+    of a run that was already checked, otherwise the budget is checked here.
+    """
     logger.info(f"Executing task: {task_id}")
     
+    task_config = TASK_REGISTRY.get(task_id)
+    if task_config is None:
+        logger.error(f"Task {task_id} not found in registry")
+        if run_id:
+            release_run_budget(run_id)
+        return {"status": "error", "message": f"Task {task_id} not found"}
+    
     if not scrapybara_client:
         error_msg = "Scrapybara client not initialized. Check SCRAPYBARA_API_KEY."
         logger.error(error_msg)
+        if run_id:
+            release_run_budget(run_id)
         task_config['last_error'] = {
             'message': error_msg,
             'timestamp': datetime.utcnow().isoformat()
         }
+        invalidate_task_cache(task_id)
         return {"status": "error", "message": error_msg}
     
+    # Check the budget before starting an instance
+    if not run_id:
+        reason, run_id = reserve_run_budget(task_id, task_config)
+        if reason:
+            return handle_over_budget(task_id, reason)
+    
+    # The run fits the budget, so an earlier defer or skip no longer applies
+    if task_config.pop('last_budget_decision', None):
+        invalidate_task_cache(task_id)
+        save_task_registry()
+    
+    usage = {
+        'run_id': run_id,
+        'task_id': task_id,
+        'model_provider': task_config.get('model_provider', 'gpt4'),
+        'instance_type': task_config.get('instance_type', 'ubuntu'),
+        'status': 'error',
+        'started_at': datetime.utcnow().isoformat(),
+        'instance_seconds': 0.0,
+        'act_seconds': 0.0,
+        'steps': 0,
+        'tool_calls': 0,
+    }
+    
+    try:
+        result = run_task_on_instance(task_id, task_config, usage)
+        usage['status'] = result['status']
+        return result
+    finally:
+        record_run_usage(usage)
+        invalidate_task_cache(task_id)
+
+def run_task_on_instance(task_id: str, task_config: Dict[str, Any], usage: Dict[str, Any]):
+    """Run a task on a Scrapybara instance, recording its usage"""
     try:
         # Extract task configuration
         instance_type = task_config.get('instance_type', 'ubuntu')
@@ -201,7 +547,17 @@ def execute_task(task_id: str, task_config: Dict[str, Any]):
         system_prompt = task_config.get('system_prompt')
         schema = task_config.get('schema')
         
+        # Select the model before starting an instance so it is never left running
+        if model_provider == 'gpt4':
+            model_name = "gpt-4o-2024-05-13"  # Latest GPT-4o model
+        elif model_provider == 'claude':
+            model_name = "claude-3-opus-20240229"  # Latest Claude model
+        else:
+            logger.error(f"Invalid model provider: {model_provider}")
+            return {"status": "error", "message": f"Invalid model provider: {model_provider}"}
+        
         # Start the appropriate instance
+        instance_started = time.monotonic()
         if instance_type == 'ubuntu':
             instance = scrapybara_client.start_ubuntu(timeout_hours=1)
             if model_provider == 'gpt4':
@@ -227,20 +583,12 @@ def execute_task(task_id: str, task_config: Dict[str, Any]):
         # Use provided system prompt or default
         system = system_prompt if system_prompt else default_system_prompt
         
-        # Select the model
-        if model_provider == 'gpt4':
-            model_name = "gpt-4o-2024-05-13"  # Latest GPT-4o model
-        elif model_provider == 'claude':
-            model_name = "claude-3-opus-20240229"  # Latest Claude model
-        else:
-            logger.error(f"Invalid model provider: {model_provider}")
-            return {"status": "error", "message": f"Invalid model provider: {model_provider}"}
-        
         # Execute the task
         try:
             # Define a callback for handling steps
             def handle_step(step):
                 logger.info(f"Task {task_id} step: {step.text[:100]}...")
+                usage['steps'] += 1
                 
                 # Store step information in task results
                 if 'steps' not in task_config:
@@ -252,6 +600,7 @@ def execute_task(task_id: str, task_config: Dict[str, Any]):
                 }
                 
                 if step.tool_calls:
+                    usage['tool_calls'] += len(step.tool_calls)
                     step_info['tool_calls'] = []
                     for call in step.tool_calls:
                         step_info['tool_calls'].append({
@@ -260,16 +609,21 @@ def execute_task(task_id: str, task_config: Dict[str, Any]):
                         })
                 
                 task_config['steps'].append(step_info)
+                invalidate_task_cache(task_id)
             
             # Execute the task with Scrapybara
-            response = scrapybara_client.act(
-                model=model_name,
-                instance=instance,
-                system=system,
-                prompt=prompt,
-                schema=schema,
-                on_step=handle_step
-            )
+            act_started = time.monotonic()
+            try:
+                response = scrapybara_client.act(
+                    model=model_name,
+                    instance=instance,
+                    system=system,
+                    prompt=prompt,
+                    schema=schema,
+                    on_step=handle_step
+                )
+            finally:
+                usage['act_seconds'] = time.monotonic() - act_started
             
             # Store the results
             task_config['last_run'] = datetime.utcnow().isoformat()
@@ -308,6 +662,7 @@ def execute_task(task_id: str, task_config: Dict[str, Any]):
                 logger.info(f"Instance for task {task_id} stopped")
             except Exception as e:
                 logger.error(f"Error stopping instance for task {task_id}: {str(e)}")
+            usage['instance_seconds'] = time.monotonic() - instance_started
     
     except Exception as e:
         logger.error(f"Error in execute_task for {task_id}: {str(e)}")
@@ -347,6 +702,8 @@ def schedule_task(task_id: str, task_config: Dict[str, Any]):
                 task_id,
                 trigger=trigger
             )
+            # Jobs only store the task ID (older jobs stored a copy of the config)
+            scheduler.modify_job(task_id, args=[task_id])
             logger.info(f"Rescheduled task: {task_id}")
         else:
             # Add new job
@@ -354,7 +711,7 @@ def schedule_task(task_id: str, task_config: Dict[str, Any]):
                 execute_task,
                 trigger=trigger,
                 id=task_id,
-                args=[task_id, task_config],
+                args=[task_id],
                 replace_existing=True
             )
             logger.info(f"Scheduled new task: {task_id}")
@@ -375,30 +732,20 @@ async def read_root():
         "description": "API for managing Skybit agents and tasks"
     }
 
-@app.get("/api/tasks", tags=["Tasks"])
+@app.get("/api/tasks", response_class=PreSerializedJSONResponse, tags=["Tasks"])
 async def get_tasks():
     """Get all tasks - React Admin compatible format"""
-    tasks = []
-    for task_id, task_config in TASK_REGISTRY.items():
-        task = task_config.copy()
-        task['id'] = task_id
-        task['next_run'] = get_next_run_time(task_id)
-        tasks.append(task)
-    
-    # React Admin expects an array directly
-    return tasks
+    # React Admin expects an array directly, assembled from the cached tasks
+    tasks = [get_task_item_json(task_id) for task_id in list(TASK_REGISTRY)]
+    return PreSerializedJSONResponse(b"[" + b",".join(tasks) + b"]")
 
-@app.get("/api/tasks/{task_id}", response_model=TaskResponse, tags=["Tasks"])
+@app.get("/api/tasks/{task_id}", response_model=TaskResponse, response_class=PreSerializedJSONResponse, tags=["Tasks"])
 async def get_task(task_id: str):
     """Get a specific task"""
     if task_id not in TASK_REGISTRY:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
     
-    task_config = TASK_REGISTRY[task_id].copy()
-    task_config['id'] = task_id
-    task_config['next_run'] = get_next_run_time(task_id)
-    
-    return task_config
+    return PreSerializedJSONResponse(get_task_detail_json(task_id))
 
 @app.post("/api/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED, tags=["Tasks"])
 async def create_task(task: TaskCreate):
@@ -421,6 +768,7 @@ async def create_task(task: TaskCreate):
         
         # Add task to registry
         TASK_REGISTRY[task_id] = task_config
+        invalidate_task_cache(task_id)
         
         # Schedule task if enabled
         if task_config['enabled']:
@@ -469,6 +817,7 @@ async def update_task(task_id: str, task: TaskUpdate):
                 task_config[key] = value
         
         task_config['updated_at'] = datetime.utcnow().isoformat()
+        invalidate_task_cache(task_id)
         
         # Reschedule task if enabled
         if task_config.get('enabled', True):
@@ -483,6 +832,9 @@ async def update_task(task_id: str, task: TaskUpdate):
             if scheduler.get_job(task_id):
                 scheduler.remove_job(task_id)
                 logger.info(f"Removed scheduled job for task: {task_id}")
+            if scheduler.get_job(f"{task_id}_deferred"):
+                scheduler.remove_job(f"{task_id}_deferred")
+                logger.info(f"Removed deferred job for task: {task_id}")
         
         # Save task registry
         save_task_registry()
@@ -517,9 +869,13 @@ async def delete_task(task_id: str):
         if scheduler.get_job(task_id):
             scheduler.remove_job(task_id)
             logger.info(f"Removed scheduled job for task: {task_id}")
+        if scheduler.get_job(f"{task_id}_deferred"):
+            scheduler.remove_job(f"{task_id}_deferred")
+            logger.info(f"Removed deferred job for task: {task_id}")
         
         # Remove task from registry
         del TASK_REGISTRY[task_id]
+        invalidate_task_cache(task_id)
         
         # Save task registry
         save_task_registry()
@@ -547,8 +903,18 @@ async def run_task(task_id: str, background_tasks: BackgroundTasks):
         
         task_config = TASK_REGISTRY[task_id]
         
+        # Check the budget up front so a deferred or skipped run is reported
+        reason, run_id = reserve_run_budget(task_id, task_config)
+        if reason:
+            result = handle_over_budget(task_id, reason)
+            return {
+                "task_id": task_id,
+                "status": result['status'],
+                "message": result['message']
+            }
+        
         # Execute task in background
-        background_tasks.add_task(execute_task, task_id, task_config)
+        background_tasks.add_task(execute_task, task_id, run_id)
         
         return {
             "task_id": task_id,
@@ -578,6 +944,7 @@ async def enable_task(task_id: str):
         task_config = TASK_REGISTRY[task_id]
         task_config['enabled'] = True
         task_config['updated_at'] = datetime.utcnow().isoformat()
+        invalidate_task_cache(task_id)
         
         # Schedule task
         success = schedule_task(task_id, task_config)
@@ -619,11 +986,15 @@ async def disable_task(task_id: str):
         task_config = TASK_REGISTRY[task_id]
         task_config['enabled'] = False
         task_config['updated_at'] = datetime.utcnow().isoformat()
+        invalidate_task_cache(task_id)
         
         # Remove job from scheduler
         if scheduler.get_job(task_id):
             scheduler.remove_job(task_id)
             logger.info(f"Removed scheduled job for task: {task_id}")
+        if scheduler.get_job(f"{task_id}_deferred"):
+            scheduler.remove_job(f"{task_id}_deferred")
+            logger.info(f"Removed deferred job for task: {task_id}")
         
         # Save task registry
         save_task_registry()
@@ -658,12 +1029,62 @@ async def get_task_steps(task_id: str):
     
     return steps
 
+@app.get("/api/budget", tags=["Budget"])
+async def get_budget():
+    """Get budget configuration and usage for the current period"""
+    period_start, period_end = get_budget_period()
+    
+    with usage_lock:
+        runs = get_period_runs()
+        active_runs = len(ACTIVE_RUNS)
+        # Estimated usage of running tasks, which the scheduler already counts
+        reserved = {
+            metric: sum(reservation[metric] for reservation in ACTIVE_RUNS.values())
+            for metric in BUDGET_LIMITS
+        }
+    
+    usage = summarize_usage(runs)
+    remaining = {}
+    for metric, limit_key in BUDGET_LIMITS.items():
+        limit = BUDGET_CONFIG.get(limit_key)
+        remaining[metric] = None if limit is None else max(limit - usage[metric] - reserved[metric], 0)
+    
+    by_task = {}
+    by_model_provider = {}
+    for run in runs:
+        by_task.setdefault(run['task_id'], []).append(run)
+        by_model_provider.setdefault(run['model_provider'], []).append(run)
+    
+    return {
+        "config": BUDGET_CONFIG,
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "active_runs": active_runs,
+        "usage": usage,
+        "reserved": reserved,
+        "remaining": remaining,
+        "by_task": {key: summarize_usage(value) for key, value in by_task.items()},
+        "by_model_provider": {key: summarize_usage(value) for key, value in by_model_provider.items()}
+    }
+
+@app.put("/api/budget", response_model=BudgetConfig, tags=["Budget"])
+async def update_budget(budget: BudgetConfig):
+    """Update the budget configuration"""
+    update_data = budget.dict(exclude_unset=True)
+    
+    with usage_lock:
+        BUDGET_CONFIG.update(BudgetConfig(**{**BUDGET_CONFIG, **update_data}).dict())
+        save_budget_config()
+    
+    return BUDGET_CONFIG
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application on startup"""
     # Load task registry
     load_task_registry()
+    load_usage_ledger()
     
     # Schedule all enabled tasks
     for task_id, task_config in TASK_REGISTRY.items():
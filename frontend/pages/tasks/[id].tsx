@@ -13,6 +13,7 @@ interface Task {
   enabled: boolean;
   last_run?: string;
   last_error?: any;
+  last_budget_decision?: any;
   last_result?: any;
   prompt: string;
   system_prompt?: string;
@@ -241,6 +242,21 @@ export default function TaskDetail() {
         </div>
       )}
 
+      {task.last_budget_decision && (
+        <div style={{ padding: '20px', backgroundColor: 'white', borderRadius: '8px', boxShadow: '0 2px 4px rgba(0,0,0,0.1)', marginBottom: '20px' }}>
+          <h2 style={{ marginTop: 0 }}>Last Budget Decision</h2>
+          <div style={{ 
+            backgroundColor: '#f5f5f5', 
+            padding: '15px', 
+            borderRadius: '4px',
+            whiteSpace: 'pre-wrap',
+            fontFamily: 'monospace'
+          }}>
+            {task.last_budget_decision.message}
+          </div>
+        </div>
+      )}
+
       {task.last_error && (
         <div style={{ padding: '20px', backgroundColor: 'white', borderRadius: '8px', boxShadow: '0 2px 4px rgba(0,0,0,0.1)' }}>
           <h2 style={{ marginTop: 0, color: '#c62828' }}>Last Error</h2>